@@ -17,20 +17,22 @@ image = (
         "plotly",
         "openai",
         "requests",
+        "aiohttp",
         "beautifulsoup4",
         "lxml",
         "supabase",
+        "pyarrow",
+        "orjson",
         "python-dotenv"
     ])
     .apt_install(["git"])
+    # Bake the source code into a cached image layer instead of
+    # re-uploading it as a mount on every invocation
+    .add_local_dir("src", remote_path="/app/src", copy=True)
 )
 
-# Mount the source code
-mount = modal.Mount.from_local_dir("src", remote_path="/app/src")
-
 @app.function(
     image=image,
-    mounts=[mount],
     secrets=[
         modal.Secret.from_name("openai-secret"),  # You'll need to create this
         modal.Secret.from_name("supabase-secret")  # You'll need to create this
@@ -61,7 +63,7 @@ def run_streamlit():
     ])
 
 # Deployment function that can be called from CLI
-@app.function(image=image, mounts=[mount])
+@app.function(image=image)
 def deploy():
     """Deploy the Streamlit app"""
     print("Deploying WSJ Sentiment Analysis Dashboard to Modal...")
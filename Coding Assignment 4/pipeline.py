@@ -5,6 +5,8 @@ Orchestrates the entire WSJ sentiment analysis pipeline
 
 import sys
 import os
+import queue
+import threading
 from datetime import datetime
 
 # Add src directory to path
@@ -13,6 +15,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 from collector import WSJCollector
 from structurer import WSJStructurer
 from loader import SupabaseLoader
+from llm_client import LLMClient
 
 def run_pipeline(max_articles=3, section_url="https://www.wsj.com/news/business"):
     """
@@ -27,34 +30,55 @@ def run_pipeline(max_articles=3, section_url="https://www.wsj.com/news/business"
     print(f"Started at: {datetime.now()}")
     print("="*60)
     
-    # Step 1: Collect articles
-    print("\\n1. COLLECTING ARTICLES...")
+    # Steps 1+2: Collect and structure as a pipelined producer/consumer.
+    # Scraping is network-bound and structuring is LLM-bound, so a scraper
+    # thread feeds article chunks through a bounded queue while the
+    # structurer consumes them - the two phases overlap instead of running
+    # back to back.
+    print("\\n1+2. COLLECTING AND STRUCTURING ARTICLES (pipelined)...")
     collector = WSJCollector()
-    
+    structurer = WSJStructurer()
+
+    article_queue = queue.Queue(maxsize=8)
+    raw_blob = []
+    scrape_errors = []
+
+    def scrape_worker():
+        try:
+            for chunk in collector.iter_articles(section_url=section_url, max_articles=max_articles):
+                article_queue.put(chunk)
+        except Exception as e:
+            scrape_errors.append(e)
+        finally:
+            article_queue.put(None)  # Sentinel: no more chunks
+
+    def queued_chunks():
+        while True:
+            chunk = article_queue.get()
+            if chunk is None:
+                return
+            raw_blob.append(chunk)
+            yield chunk
+
     try:
-        raw_blob = collector.collect_articles(
-            section_url=section_url, 
-            max_articles=max_articles
-        )
-        
+        producer = threading.Thread(target=scrape_worker, daemon=True)
+        producer.start()
+
+        structured_data = structurer.structure_stream(queued_chunks())
+
+        producer.join()
+
+        if scrape_errors:
+            print(f"Collection error: {scrape_errors[0]}")
+            return False
+
         if raw_blob:
             blob_file = collector.save_blob(raw_blob)
             print(f"Collection complete: {blob_file}")
         else:
             print("Collection failed")
             return False
-            
-    except Exception as e:
-        print(f"Collection error: {e}")
-        return False
-    
-    # Step 2: Structure the data
-    print("\\n2. STRUCTURING DATA...")
-    structurer = WSJStructurer()
-    
-    try:
-        structured_data = structurer.process_blob(raw_blob)
-        
+
         if structured_data and structured_data.get('articles'):
             json_file = structurer.save_structured_data(structured_data)
             article_count = len(structured_data['articles'])
@@ -63,11 +87,11 @@ def run_pipeline(max_articles=3, section_url="https://www.wsj.com/news/business"
         else:
             print("Structuring failed")
             return False
-            
+
     except Exception as e:
         print(f"Structuring error: {e}")
         return False
-    
+
     # Step 3: Load to database
     print("\\n3. LOADING TO DATABASE...")
     loader = SupabaseLoader()
@@ -90,24 +114,20 @@ def run_pipeline(max_articles=3, section_url="https://www.wsj.com/news/business"
                 
                 print(f"Articles processed: {len(df)}")
                 print("\\nSentiment breakdown:")
-                sentiment_counts = df.groupby('sentiment').size()
+                sentiment_counts = df['sentiment'].value_counts()
                 for sentiment, count in sentiment_counts.items():
                     print(f"  {sentiment}: {count}")
-                
+
                 print("\\nMarket impact breakdown:")
-                impact_counts = df.groupby('market_impact').size()
+                impact_counts = df['market_impact'].value_counts()
                 for impact, count in impact_counts.items():
                     print(f"  {impact}: {count}")
-                
+
                 print("\\nTop topics:")
-                all_topics = []
-                for topics in df['key_topics']:
-                    if isinstance(topics, list):
-                        all_topics.extend(topics)
-                
-                from collections import Counter
-                topic_counts = Counter(all_topics)
-                for topic, count in topic_counts.most_common(5):
+                topic_counts = df.attrs.get('top_topics')
+                if topic_counts is None:
+                    topic_counts = df['key_topics'].explode().dropna().value_counts()
+                for topic, count in topic_counts.head(5).items():
                     print(f"  {topic}: {count}")
                 
                 return True
@@ -129,7 +149,6 @@ def test_components():
     # Test LLM Client
     print("\\n1. Testing LLM Client...")
     try:
-        from llm_client import LLMClient
         client = LLMClient()
         response = client.test_connection()
         if response:
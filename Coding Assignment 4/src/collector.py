@@ -4,11 +4,20 @@ Scrapes WSJ articles and saves raw text to blob file
 """
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from bs4 import BeautifulSoup
+import asyncio
+import random
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 class WSJCollector:
     def __init__(self, output_dir="data"):
         self.output_dir = output_dir
@@ -16,6 +25,29 @@ class WSJCollector:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         self.base_url = "https://www.wsj.com"
+
+        # Persistent session so every request reuses the same TCP+TLS
+        # connection instead of paying a fresh handshake per page
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retries))
+
+        # Combined CSS selectors so extraction is a single tree traversal
+        # instead of one select_one call per candidate selector
+        self.title_selector = ', '.join([
+            'h1',
+            '.headline',
+            '.wsj-article-headline',
+            '[data-module="ArticleHeader"] h1'
+        ])
+        self.body_selector = ', '.join([
+            '.articleBody',
+            '[data-module="ArticleBody"]',
+            '.wsj-snippet-body',
+            '.article-content',
+            'div[data-module="BodyText"]'
+        ])
         
     def get_article_links(self, section_url="https://www.wsj.com/news/business", max_articles=5):
         """
@@ -29,14 +61,18 @@ class WSJCollector:
             List of article URLs
         """
         try:
-            response = requests.get(section_url, headers=self.headers)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            # Stream the body straight into the parser instead of
+            # buffering the full page into response.content first
+            with self.session.get(section_url, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                soup = BeautifulSoup(response.raw, 'lxml')
+
             # Find article links - WSJ uses various selectors
+            # A set mirrors the ordered list for O(1) dedup checks
             article_links = []
-            
+            seen = set()
+
             # Common WSJ article link patterns
             selectors = [
                 'a[href*="/articles/"]',
@@ -44,7 +80,7 @@ class WSJCollector:
                 '.WSJTheme--headline-link--',
                 '.headline-link'
             ]
-            
+
             for selector in selectors:
                 links = soup.select(selector)
                 for link in links:
@@ -52,12 +88,15 @@ class WSJCollector:
                     if href:
                         if href.startswith('/'):
                             href = self.base_url + href
-                        if '/articles/' in href and href not in article_links:
+                        if '/articles/' in href and href not in seen:
+                            seen.add(href)
                             article_links.append(href)
-                            
+                            if len(article_links) >= max_articles:
+                                return article_links
+
                 if len(article_links) >= max_articles:
                     break
-                    
+
             return article_links[:max_articles]
             
         except Exception as e:
@@ -75,42 +114,49 @@ class WSJCollector:
             Dictionary with article data or None if failed
         """
         try:
-            response = requests.get(article_url, headers=self.headers)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            with self.session.get(article_url, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                return self.parse_article(response.raw, article_url)
+
+        except Exception as e:
+            print(f"Error scraping article {article_url}: {e}")
+            return None
+
+    def parse_article(self, content, article_url):
+        """
+        Parse raw article HTML into structured data
+
+        Args:
+            content: Raw HTML bytes (or a file-like object) of the article page
+            article_url: URL of the article (for metadata)
+
+        Returns:
+            Dictionary with article data or None if failed
+        """
+        try:
+            soup = BeautifulSoup(content, 'lxml')
+
             # Extract title
-            title_selectors = ['h1', '.headline', '.wsj-article-headline', '[data-module="ArticleHeader"] h1']
             title = None
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text().strip()
-                    break
-            
-            # Extract article body
-            body_selectors = [
-                '.articleBody',
-                '[data-module="ArticleBody"]',
-                '.wsj-snippet-body',
-                '.article-content',
-                'div[data-module="BodyText"]'
-            ]
-            
+            title_elem = soup.select_one(self.title_selector)
+            if title_elem:
+                title = title_elem.get_text().strip()
+
+            # Extract article body - each paragraph's text is extracted
+            # exactly once instead of once for the filter and once for the value
             content_paragraphs = []
-            for selector in body_selectors:
-                body_elem = soup.select_one(selector)
-                if body_elem:
-                    paragraphs = body_elem.find_all('p')
-                    content_paragraphs = [p.get_text().strip() for p in paragraphs if p.get_text().strip()]
-                    break
-            
-            # If no specific body found, try general paragraph approach
+            body_elem = soup.select_one(self.body_selector)
+            if body_elem:
+                paragraph_texts = (p.get_text().strip() for p in body_elem.find_all('p'))
+                content_paragraphs = [text for text in paragraph_texts if text]
+
+            # If no specific body found, walk the document's paragraphs once,
+            # filtering out short boilerplate
             if not content_paragraphs:
-                all_paragraphs = soup.find_all('p')
-                content_paragraphs = [p.get_text().strip() for p in all_paragraphs if len(p.get_text().strip()) > 50]
-            
+                paragraph_texts = (p.get_text().strip() for p in soup.find_all('p'))
+                content_paragraphs = [text for text in paragraph_texts if len(text) > 50]
+
             content = '\\n\\n'.join(content_paragraphs) if content_paragraphs else ""
             
             if title and content:
@@ -123,11 +169,131 @@ class WSJCollector:
             else:
                 print(f"Could not extract content from {article_url}")
                 return None
-                
+
         except Exception as e:
-            print(f"Error scraping article {article_url}: {e}")
+            print(f"Error parsing article {article_url}: {e}")
             return None
-    
+
+    async def _fetch(self, session, url):
+        """Fetch a single URL and return the raw response body"""
+        async with session.get(url, headers=self.headers) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def _fetch_all(self, urls, max_concurrent=5):
+        """
+        Fetch multiple URLs concurrently with bounded concurrency
+
+        Args:
+            urls: List of URLs to fetch
+            max_concurrent: Maximum number of requests in flight at once
+
+        Returns:
+            List of raw response bodies (None for failed fetches), in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async with aiohttp.ClientSession() as session:
+            async def bound_fetch(url):
+                async with semaphore:
+                    # Be respectful to the server - jittered delay instead of a fixed sleep
+                    await asyncio.sleep(random.uniform(1, 2))
+                    try:
+                        return await self._fetch(session, url)
+                    except Exception as e:
+                        print(f"Error fetching {url}: {e}")
+                        return None
+
+            return await asyncio.gather(*(bound_fetch(url) for url in urls))
+
+    def _fetch_sync(self, url):
+        """Fetch one URL over the shared session with a jittered politeness delay"""
+        time.sleep(random.uniform(1, 2))
+        try:
+            response = self.session.get(url)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    def _fetch_all_threaded(self, urls, max_workers=5):
+        """
+        Thread-pool fallback for concurrent fetching when aiohttp is not installed
+
+        requests releases the GIL around socket I/O, so a small pool of
+        threads overlaps the downloads almost as well as the async path.
+
+        Args:
+            urls: List of URLs to fetch
+            max_workers: Number of worker threads
+
+        Returns:
+            List of raw response bodies (None for failed fetches), in input order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self._fetch_sync, urls))
+
+    def _format_article(self, index, article_data):
+        """Format one scraped article as a blob chunk (separator included)"""
+        formatted_article = f"""
+=== ARTICLE {index} ===
+TITLE: {article_data['title']}
+URL: {article_data['url']}
+SCRAPED: {article_data['scraped_at']}
+
+CONTENT:
+{article_data['content']}
+
+{'='*50}
+"""
+        return formatted_article + '\\n'
+
+    def iter_articles(self, section_url="https://www.wsj.com/news/business", max_articles=3):
+        """
+        Yield formatted article chunks as they are scraped
+
+        Generator counterpart to collect_articles for pipelined callers:
+        pages download in a thread pool while articles that already
+        arrived are handed downstream, so scraping overlaps with
+        whatever consumes the chunks.
+
+        Args:
+            section_url: WSJ section to scrape
+            max_articles: Number of articles to collect
+
+        Yields:
+            Formatted article chunk strings
+        """
+        print(f"Getting article links from {section_url}...")
+        article_links = self.get_article_links(section_url, max_articles)
+
+        if not article_links:
+            print("No article links found. Using sample content...")
+            yield self.create_sample_content()
+            return
+
+        print(f"Found {len(article_links)} article links")
+
+        collected = 0
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            # executor.map is lazy: results stream back in order while
+            # later downloads are still in flight
+            for i, (url, page) in enumerate(zip(article_links, executor.map(self._fetch_sync, article_links))):
+                if page is None:
+                    continue
+
+                article_data = self.parse_article(page, url)
+                if article_data:
+                    collected += 1
+                    yield self._format_article(i + 1, article_data)
+
+        if not collected:
+            print("No articles successfully scraped. Creating sample content...")
+            yield self.create_sample_content()
+        else:
+            print(f"Successfully collected {collected} articles")
+
     def collect_articles(self, section_url="https://www.wsj.com/news/business", max_articles=3):
         """
         Collect multiple articles and combine into a blob
@@ -137,7 +303,7 @@ class WSJCollector:
             max_articles: Number of articles to collect
             
         Returns:
-            String blob of all article content
+            List of formatted article chunks (joinable into a blob)
         """
         print(f"Getting article links from {section_url}...")
         article_links = self.get_article_links(section_url, max_articles)
@@ -153,42 +319,33 @@ class WSJCollector:
             return self.create_sample_content()
         
         print(f"Found {len(article_links)} article links")
-        
+
+        # Fetch all articles concurrently instead of one at a time
+        print(f"Fetching {len(article_links)} articles concurrently...")
+        if aiohttp is not None:
+            raw_pages = asyncio.run(self._fetch_all(article_links))
+        else:
+            raw_pages = self._fetch_all_threaded(article_links)
+
         all_content = []
         articles_collected = []
-        
-        for i, url in enumerate(article_links):
-            print(f"Scraping article {i+1}/{len(article_links)}: {url}")
-            
-            article_data = self.scrape_article(url)
+
+        for i, (url, page) in enumerate(zip(article_links, raw_pages)):
+            if page is None:
+                continue
+
+            article_data = self.parse_article(page, url)
             if article_data:
                 articles_collected.append(article_data)
-                
-                # Format article for blob
-                formatted_article = f"""
-=== ARTICLE {i+1} ===
-TITLE: {article_data['title']}
-URL: {article_data['url']}
-SCRAPED: {article_data['scraped_at']}
-
-CONTENT:
-{article_data['content']}
+                all_content.append(self._format_article(i + 1, article_data))
 
-{'='*50}
-"""
-                all_content.append(formatted_article)
-            
-            # Be respectful to the server
-            time.sleep(2)
-        
         if not all_content:
             print("No articles successfully scraped. Creating sample content...")
             return self.create_sample_content()
-        
-        blob_content = '\\n'.join(all_content)
+
         print(f"Successfully collected {len(articles_collected)} articles")
-        
-        return blob_content
+
+        return all_content
     
     def create_sample_content(self):
         """Create sample WSJ-style content for testing when scraping fails"""
@@ -246,19 +403,23 @@ Several major energy companies announced new partnerships with renewable technol
     def save_blob(self, content, filename="raw_blob.txt"):
         """
         Save the content blob to disk
-        
+
         Args:
-            content: String content to save
+            content: String content, or an iterable of string chunks to
+                     stream to disk without joining into one big string
             filename: Output filename
         """
         filepath = os.path.join(self.output_dir, filename)
         os.makedirs(self.output_dir, exist_ok=True)
-        
+
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                f.writelines(content)
+
         print(f"Content saved to {filepath}")
-        print(f"Blob size: {len(content)} characters")
+        print(f"Blob size: {os.path.getsize(filepath)} characters")
         return filepath
 
 if __name__ == "__main__":
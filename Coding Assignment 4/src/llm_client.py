@@ -6,45 +6,72 @@ Handles the connection to the OpenAI API endpoint
 import openai
 from openai import OpenAI
 import os
+import time
+import random
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv('config/.env')
 
 class LLMClient:
-    def __init__(self):
+    def __init__(self, max_retries=5, min_request_interval=1.0):
         self.endpoint = os.getenv('OPENAI_ENDPOINT')
         self.api_key = os.getenv('OPENAI_API_KEY')
         self.deployment_name = os.getenv('OPENAI_DEPLOYMENT')
-        
+
         self.client = OpenAI(
             base_url=self.endpoint,
             api_key=self.api_key
         )
-    
+
+        # Retry/rate-limit policy: retry 429s with exponential backoff and
+        # keep a minimum spacing between requests to stay under RPM quota
+        self.max_retries = max_retries
+        self.min_request_interval = min_request_interval
+        self._last_request_time = 0.0
+
+    def _wait_for_rate_limit(self):
+        """Sleep just long enough to keep requests spaced apart"""
+        elapsed = time.monotonic() - self._last_request_time
+        if elapsed < self.min_request_interval:
+            time.sleep(self.min_request_interval - elapsed)
+        self._last_request_time = time.monotonic()
+
     def generate_completion(self, messages, max_tokens=2000, temperature=0.3):
         """
         Generate a completion using the OpenAI API
-        
+
+        Retries rate-limit and transient API errors with exponential
+        backoff instead of dropping the article on the first 429.
+
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             max_tokens: Maximum tokens in response
             temperature: Creativity level (0-1)
-        
+
         Returns:
             String response from the model
         """
-        try:
-            response = self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"Error calling LLM: {e}")
-            return None
+        for attempt in range(self.max_retries):
+            self._wait_for_rate_limit()
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.deployment_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                return response.choices[0].message.content
+            except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+                wait = min(2 ** attempt + random.uniform(0, 1), 60)
+                print(f"LLM request failed ({e}), retrying in {wait:.1f}s...")
+                time.sleep(wait)
+            except Exception as e:
+                print(f"Error calling LLM: {e}")
+                return None
+
+        print(f"LLM request failed after {self.max_retries} attempts")
+        return None
 
     def test_connection(self):
         """Test the LLM connection with a simple query"""
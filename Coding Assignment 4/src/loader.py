@@ -10,6 +10,11 @@ from datetime import datetime
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv('config/.env')
 
@@ -45,31 +50,36 @@ class SupabaseLoader:
             return pd.DataFrame()
         
         articles = structured_data['articles']
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(articles)
-        
-        # Ensure all required columns exist
+
+        # Build all columns from the dicts up front - one DataFrame
+        # allocation instead of repeated per-column inserts afterwards
+        keys = list(dict.fromkeys(key for article in articles for key in article))
+        df = pd.DataFrame({key: [article.get(key) for article in articles] for key in keys})
+
+        # Ensure all required columns exist - fill any missing ones with a
+        # single assign instead of one block-reallocating insert per column
         required_columns = [
-            'id', 'title', 'summary', 'sentiment', 'sentiment_score', 
+            'id', 'title', 'summary', 'sentiment', 'sentiment_score',
             'key_topics', 'market_impact', 'source_url', 'extracted_at'
         ]
-        
-        for col in required_columns:
-            if col not in df.columns:
-                if col == 'sentiment_score':
-                    df[col] = 0.0
-                elif col == 'key_topics':
-                    df[col] = [['unknown'] for _ in range(len(df))]
-                else:
-                    df[col] = 'unknown'
-        
-        # Convert extracted_at to datetime
-        df['extracted_at'] = pd.to_datetime(df['extracted_at'])
+        defaults = {'sentiment_score': 0.0, 'key_topics': [['unknown']] * len(df)}
+
+        missing = [col for col in required_columns if col not in df.columns]
+        if missing:
+            df = df.assign(**{col: defaults.get(col, 'unknown') for col in missing})
+
+
+        # Convert extracted_at to datetime; the format hint keeps pandas
+        # on its C parse path instead of per-row inference
+        df['extracted_at'] = pd.to_datetime(df['extracted_at'], format='ISO8601')
         
         # Add updated_at timestamp
         df['updated_at'] = datetime.now()
-        
+
+        # Aggregate topics once so downstream consumers (pipeline summary,
+        # dashboard) don't each re-explode the column
+        df.attrs['top_topics'] = df['key_topics'].explode().dropna().value_counts()
+
         print(f"Created DataFrame with {len(df)} articles")
         return df
     
@@ -93,66 +103,110 @@ class SupabaseLoader:
             print("Please create the table using the SQL in schema.py")
             return False
     
-    def upsert_articles(self, df):
+    def upsert_articles(self, df, batch_size=500):
         """
         Upsert articles into Supabase table
-        
+
         Args:
             df: pandas DataFrame with article data
-            
+            batch_size: Number of rows per upsert request
+
         Returns:
             Boolean indicating success
         """
         if not self.supabase:
             print("No Supabase connection - saving to local file instead")
-            return self.save_to_csv(df)
+            return self.save_backup(df)
         
         if df.empty:
             print("No data to upsert")
             return False
         
         try:
+            # Convert datetime columns to ISO strings for JSON serialization
+            # (vectorized per column instead of checking every cell)
+            datetime_cols = df.select_dtypes(include=['datetime64[ns]', 'datetimetz']).columns
+            df = df.assign(**{col: df[col].dt.strftime('%Y-%m-%dT%H:%M:%S') for col in datetime_cols})
+
             # Convert DataFrame to list of dictionaries
             records = df.to_dict('records')
-            
-            # Convert datetime objects to ISO strings for JSON serialization
-            for record in records:
-                for key, value in record.items():
-                    if isinstance(value, pd.Timestamp):
-                        record[key] = value.isoformat()
-                    elif isinstance(value, datetime):
-                        record[key] = value.isoformat()
-            
-            # Upsert into Supabase
-            result = self.supabase.table('wsj_articles').upsert(records).execute()
-            
-            if result.data:
-                print(f"Successfully upserted {len(result.data)} articles")
+
+            # Upsert into Supabase in batches to keep each payload small
+            upserted = 0
+            for i in range(0, len(records), batch_size):
+                result = self.supabase.table('wsj_articles').upsert(records[i:i + batch_size]).execute()
+                if result.data:
+                    upserted += len(result.data)
+
+            if upserted:
+                print(f"Successfully upserted {upserted} articles")
                 return True
             else:
                 print("Upsert completed but no data returned")
                 return True
-                
+
         except Exception as e:
             print(f"Error upserting to Supabase: {e}")
-            print("Falling back to CSV save...")
-            return self.save_to_csv(df)
+            print("Falling back to local backup...")
+            return self.save_backup(df)
     
-    def save_to_csv(self, df, filename="data/articles_backup.csv"):
+    def bulk_insert(self, records, chunk_size=1000):
         """
-        Save DataFrame to CSV as backup when Supabase is not available
-        
+        Upsert pre-serialized article records in large chunks
+
+        For callers that already hold plain record dicts (e.g. loading
+        straight from a structured JSON file), this collapses N HTTP
+        round-trips into N/chunk_size without going through a DataFrame.
+
+        Args:
+            records: List of article dicts matching the table schema
+            chunk_size: Number of rows per upsert request
+
+        Returns:
+            Boolean indicating success
+        """
+        if not self.supabase:
+            print("No Supabase connection available")
+            return False
+
+        if not records:
+            print("No records to insert")
+            return False
+
+        try:
+            for i in range(0, len(records), chunk_size):
+                self.supabase.table('wsj_articles')\
+                    .upsert(records[i:i + chunk_size], on_conflict='id')\
+                    .execute()
+
+            print(f"Bulk upserted {len(records)} articles in chunks of {chunk_size}")
+            return True
+        except Exception as e:
+            print(f"Error bulk inserting articles: {e}")
+            return False
+
+    def save_backup(self, df, filename="data/articles_backup.parquet"):
+        """
+        Save DataFrame to a local backup file when Supabase is not available
+
+        Writes Parquet via pyarrow by default (columnar, compressed, and
+        far faster to re-read than CSV); pass a .csv filename to keep the
+        old text format.
+
         Args:
             df: pandas DataFrame
-            filename: Output CSV filename
+            filename: Output filename (.parquet or .csv)
         """
         try:
             os.makedirs(os.path.dirname(filename), exist_ok=True)
-            df.to_csv(filename, index=False)
-            print(f"Data saved to CSV backup: {filename}")
+            if filename.endswith('.csv'):
+                df.to_csv(filename, index=False)
+            else:
+                df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
+            print(f"Data saved to backup: {filename}")
             return True
         except Exception as e:
-            print(f"Error saving to CSV: {e}")
+            print(f"Error saving backup: {e}")
             return False
     
     def query_recent_articles(self, limit=10):
@@ -181,6 +235,112 @@ class SupabaseLoader:
             print(f"Error querying articles: {e}")
             return None
     
+    def iter_article_pages(self, page_size=1000):
+        """
+        Yield articles from Supabase one page at a time
+
+        PostgREST caps responses at 1000 rows, so a single large select
+        silently truncates. Paging with .range() keeps each payload
+        bounded and lets callers start consuming rows while later pages
+        are still being fetched.
+
+        Args:
+            page_size: Number of rows per request
+
+        Yields:
+            Lists of article dictionaries, newest first
+        """
+        if not self.supabase:
+            print("No Supabase connection available")
+            return
+
+        offset = 0
+        while True:
+            try:
+                result = self.supabase.table('wsj_articles')\
+                    .select('*')\
+                    .order('extracted_at', desc=True)\
+                    .range(offset, offset + page_size - 1)\
+                    .execute()
+            except Exception as e:
+                print(f"Error querying articles page at offset {offset}: {e}")
+                return
+
+            if not result.data:
+                return
+
+            yield result.data
+
+            if len(result.data) < page_size:
+                return
+            offset += page_size
+
+    def query_all_articles(self, page_size=1000):
+        """
+        Fetch every article as a single DataFrame via paginated requests
+
+        Args:
+            page_size: Number of rows per request
+
+        Returns:
+            pandas DataFrame (empty if no connection or no rows)
+        """
+        pages = [pd.DataFrame(page) for page in self.iter_article_pages(page_size)]
+        if not pages:
+            return pd.DataFrame()
+        return pd.concat(pages, ignore_index=True, copy=False)
+
+    def query_filtered(self, start_date=None, end_date=None, sentiments=None, impacts=None, page_size=1000):
+        """
+        Query articles with the filters pushed down to PostgREST
+
+        Results are paged with .range() like iter_article_pages, so the
+        full filtered set comes back instead of PostgREST's capped
+        single response.
+
+        Args:
+            start_date: Inclusive ISO timestamp lower bound for extracted_at
+            end_date: Exclusive ISO timestamp upper bound for extracted_at
+            sentiments: Iterable of sentiment values to include
+            impacts: Iterable of market_impact values to include
+            page_size: Number of rows per request
+
+        Returns:
+            List of article dictionaries or None
+        """
+        if not self.supabase:
+            print("No Supabase connection available")
+            return None
+
+        def build_query():
+            query = self.supabase.table('wsj_articles').select('*')
+            if start_date:
+                query = query.gte('extracted_at', start_date)
+            if end_date:
+                query = query.lt('extracted_at', end_date)
+            if sentiments:
+                query = query.in_('sentiment', list(sentiments))
+            if impacts:
+                query = query.in_('market_impact', list(impacts))
+            return query.order('extracted_at', desc=True)
+
+        try:
+            articles = []
+            offset = 0
+            while True:
+                result = build_query().range(offset, offset + page_size - 1).execute()
+                if not result.data:
+                    break
+                articles.extend(result.data)
+                if len(result.data) < page_size:
+                    break
+                offset += page_size
+
+            return articles
+        except Exception as e:
+            print(f"Error querying filtered articles: {e}")
+            return None
+
     def get_sentiment_summary(self):
         """
         Get sentiment distribution summary
@@ -219,12 +379,14 @@ def load_from_json_file(json_file="data/structured_articles.json"):
         Dict with structured data or None
     """
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # orjson parses straight from bytes in C; fall back to stdlib json
+        with open(json_file, 'rb') as f:
+            data = f.read()
+        return orjson.loads(data) if orjson else json.loads(data)
     except FileNotFoundError:
         print(f"JSON file not found: {json_file}")
         return None
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"Error parsing JSON: {e}")
         return None
 
@@ -260,7 +422,7 @@ if __name__ == "__main__":
             else:
                 print("Please set up Supabase table first")
                 # Save as backup
-                loader.save_to_csv(df)
+                loader.save_backup(df)
         else:
             print("No data to load")
     else:
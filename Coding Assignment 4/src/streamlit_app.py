@@ -5,9 +5,9 @@ Displays articles, sentiment analysis, and visualizations
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
+import ast
 import os
 import sys
 
@@ -20,6 +20,22 @@ except ImportError:
     st.error("Could not import loader module. Make sure you're running from the correct directory.")
     st.stop()
 
+# Display labels for sentiment and market impact values
+SENTIMENT_LABELS = {
+    'very_positive': 'Very Positive',
+    'positive': 'Positive',
+    'neutral': 'Neutral',
+    'negative': 'Negative',
+    'very_negative': 'Very Negative'
+}
+
+MARKET_IMPACT_LABELS = {
+    'bullish': 'Bullish',
+    'bearish': 'Bearish',
+    'neutral': 'Neutral',
+    'mixed': 'Mixed'
+}
+
 # Page configuration
 st.set_page_config(
     page_title="WSJ Sentiment Analysis Dashboard",
@@ -28,18 +44,24 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def get_loader():
+    """Share one SupabaseLoader (and its client connection) across reruns"""
+    return SupabaseLoader()
+
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def load_data():
     """Load data from Supabase or fallback to JSON/CSV"""
-    loader = SupabaseLoader()
-    
-    # Try to load from Supabase first
+    loader = get_loader()
+
+    # Try to load from Supabase first - paginated, so the dashboard sees
+    # the full corpus instead of a hardcoded 100-row slice
     if loader.supabase:
         try:
-            articles = loader.query_recent_articles(limit=100)
-            if articles:
-                df = pd.DataFrame(articles)
-                df['extracted_at'] = pd.to_datetime(df['extracted_at'])
+            df = loader.query_all_articles()
+            if not df.empty:
+                # The format hint keeps pandas on its C parse path
+                df['extracted_at'] = pd.to_datetime(df['extracted_at'], format='ISO8601')
                 return df, "supabase"
         except Exception as e:
             st.warning(f"Could not load from Supabase: {e}")
@@ -53,48 +75,92 @@ def load_data():
     except Exception:
         pass
     
-    # Fallback to CSV backup
+    # Fallback to Parquet backup (keeps dtypes, so no date re-parse)
+    try:
+        df = pd.read_parquet("data/articles_backup.parquet")
+        # Arrow list columns come back as numpy arrays; normalize to
+        # plain lists so downstream truthiness checks behave
+        df['key_topics'] = df['key_topics'].map(list)
+        return df, "parquet"
+    except Exception:
+        pass
+
+    # Fallback to legacy CSV backup
     try:
         df = pd.read_csv("data/articles_backup.csv")
-        df['extracted_at'] = pd.to_datetime(df['extracted_at'])
+        df['extracted_at'] = pd.to_datetime(df['extracted_at'], format='ISO8601')
+        # CSV stringifies the topic lists; parse them back once here so
+        # downstream code can assume real lists
+        df['key_topics'] = df['key_topics'].map(ast.literal_eval)
         return df, "csv"
     except Exception:
         pass
-    
+
     return pd.DataFrame(), "none"
 
+@st.cache_data(ttl=300)
+def load_filtered_data(start_date, end_date, sentiments, impacts):
+    """
+    Fetch only the rows matching the sidebar filters from Supabase
+
+    The predicates run server-side via PostgREST, so filtered-out rows
+    are never downloaded. Cached on the filter tuple, so repeated
+    nudges of the same widgets hit the cache.
+    """
+    loader = get_loader()
+    articles = loader.query_filtered(
+        start_date=start_date.isoformat(),
+        end_date=(end_date + timedelta(days=1)).isoformat(),
+        sentiments=sentiments,
+        impacts=impacts
+    )
+
+    if not articles:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(articles)
+    df['extracted_at'] = pd.to_datetime(df['extracted_at'], format='ISO8601')
+    return df
+
 def create_sentiment_gauge(avg_sentiment_score):
-    """Create a sentiment gauge visualization"""
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number+delta",
-        value = avg_sentiment_score,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': "Average Sentiment Score"},
-        delta = {'reference': 0},
-        gauge = {
-            'axis': {'range': [-1, 1]},
-            'bar': {'color': "darkblue"},
-            'steps': [
-                {'range': [-1, -0.5], 'color': "red"},
-                {'range': [-0.5, 0], 'color': "orange"},
-                {'range': [0, 0.5], 'color': "lightgreen"},
-                {'range': [0.5, 1], 'color': "green"}
-            ],
-            'threshold': {
-                'line': {'color': "black", 'width': 4},
-                'thickness': 0.75,
-                'value': 0
+    """Create a sentiment gauge visualization
+
+    Returns a plain figure dict rather than a go.Figure - st.plotly_chart
+    serializes dicts directly, skipping Plotly's per-property validation.
+    """
+    return {
+        'data': [{
+            'type': 'indicator',
+            'mode': 'gauge+number+delta',
+            'value': avg_sentiment_score,
+            'domain': {'x': [0, 1], 'y': [0, 1]},
+            'title': {'text': "Average Sentiment Score"},
+            'delta': {'reference': 0},
+            'gauge': {
+                'axis': {'range': [-1, 1]},
+                'bar': {'color': "darkblue"},
+                'steps': [
+                    {'range': [-1, -0.5], 'color': "red"},
+                    {'range': [-0.5, 0], 'color': "orange"},
+                    {'range': [0, 0.5], 'color': "lightgreen"},
+                    {'range': [0.5, 1], 'color': "green"}
+                ],
+                'threshold': {
+                    'line': {'color': "black", 'width': 4},
+                    'thickness': 0.75,
+                    'value': 0
+                }
             }
-        }
-    ))
-    
-    fig.update_layout(height=300)
-    return fig
+        }],
+        'layout': {'height': 300}
+    }
+
+def create_sentiment_distribution(sentiment_counts):
+    """Create sentiment distribution chart from precomputed value counts"""
+    # Plotly is imported lazily in the chart builders so the module
+    # import (and Modal cold starts) don't pay its 1-3 s import cost
+    import plotly.graph_objects as go
 
-def create_sentiment_distribution(df):
-    """Create sentiment distribution chart"""
-    sentiment_counts = df['sentiment'].value_counts()
-    
     colors = {
         'very_positive': '#2E8B57',
         'positive': '#90EE90', 
@@ -103,22 +169,25 @@ def create_sentiment_distribution(df):
         'very_negative': '#FF4500'
     }
     
-    fig = px.bar(
-        x=sentiment_counts.index,
+    # go.Bar on raw arrays skips plotly.express's DataFrame introspection
+    fig = go.Figure(go.Bar(
+        x=sentiment_counts.index.to_numpy(),
         y=sentiment_counts.values,
-        color=sentiment_counts.index,
-        color_discrete_map=colors,
+        marker_color=[colors.get(s, '#CCCCCC') for s in sentiment_counts.index]
+    ))
+
+    fig.update_layout(
         title="Sentiment Distribution",
-        labels={'x': 'Sentiment', 'y': 'Number of Articles'}
+        xaxis_title="Sentiment",
+        yaxis_title="Number of Articles",
+        showlegend=False
     )
-    
-    fig.update_layout(showlegend=False)
     return fig
 
-def create_market_impact_chart(df):
-    """Create market impact distribution chart"""
-    impact_counts = df['market_impact'].value_counts()
-    
+def create_market_impact_chart(impact_counts):
+    """Create market impact distribution chart from precomputed value counts"""
+    import plotly.express as px
+
     colors = {
         'bullish': '#00FF00',
         'neutral': '#FFD700', 
@@ -136,71 +205,198 @@ def create_market_impact_chart(df):
     
     return fig
 
-def create_sentiment_timeline(df):
+def lttb_downsample(x, y, n_out=2000):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Reduces a series to n_out points while preserving its visual shape,
+    keeping the timeline's figure payload bounded as the corpus grows.
+
+    Args:
+        x, y: NumPy arrays of equal length
+        n_out: Maximum number of points to keep
+
+    Returns:
+        Tuple of downsampled (x, y) arrays
+    """
+    n = len(y)
+    if n <= n_out:
+        return x, y
+
+    y = np.asarray(y, dtype=np.float64)
+    x_idx = np.arange(n, dtype=np.float64)
+
+    # First and last points are always kept; the rest fall into buckets
+    edges = np.linspace(1, n - 1, n_out - 1, dtype=np.int64)
+
+    sampled = np.empty(n_out, dtype=np.int64)
+    sampled[0] = 0
+    sampled[-1] = n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_hi = edges[i + 2] if i + 2 < n_out - 1 else n
+        next_lo = min(hi, next_hi - 1)
+
+        # Average point of the following bucket
+        avg_x = x_idx[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        # Keep the bucket point forming the largest triangle with the
+        # previously selected point and the next bucket's average
+        areas = np.abs(
+            (x_idx[selected] - avg_x) * (y[lo:hi] - y[selected])
+            - (x_idx[selected] - x_idx[lo:hi]) * (avg_y - y[selected])
+        )
+        selected = lo + int(np.argmax(areas))
+        sampled[i + 1] = selected
+
+    return x[sampled], y[sampled]
+
+@st.cache_data(ttl=300)
+def aggregate_timeline(fingerprint, _dates, _scores):
+    """
+    Daily mean sentiment, memoized on a cheap frame fingerprint
+
+    The underscore-prefixed arrays are excluded from Streamlit's cache
+    key, so unchanged filters skip both the hashing and the groupby.
+    """
+    daily = pd.Series(_scores).groupby(_dates).mean()
+    return daily.index.to_numpy(), daily.to_numpy()
+
+def create_sentiment_timeline(df, filter_state=()):
     """Create sentiment over time chart"""
+    import plotly.graph_objects as go
+
     if len(df) < 2:
         return None
-    
-    # Group by date and calculate average sentiment
-    df['date'] = df['extracted_at'].dt.date
-    daily_sentiment = df.groupby('date')['sentiment_score'].mean().reset_index()
-    
-    fig = px.line(
-        daily_sentiment,
-        x='date',
-        y='sentiment_score',
+
+    # Group by day and calculate average sentiment; the groupby is
+    # cached against a (row count, latest timestamp, filter state)
+    # fingerprint - the filter state disambiguates selections that
+    # happen to share the same size and newest article.
+    # floor('D') stays in datetime64 instead of boxing Python date objects
+    fingerprint = (len(df), str(df['extracted_at'].max()), filter_state)
+    daily_x, daily_y = aggregate_timeline(
+        fingerprint,
+        df['extracted_at'].dt.floor('D').to_numpy(),
+        df['sentiment_score'].to_numpy()
+    )
+
+    # Downsample long timelines so the figure ships a bounded number of points
+    timeline_x, timeline_y = lttb_downsample(daily_x, daily_y)
+
+    # Scattergl renders through WebGL, so the timeline stays responsive
+    # as the corpus grows
+    fig = go.Figure(go.Scattergl(
+        x=timeline_x,
+        y=timeline_y,
+        mode='lines'
+    ))
+
+    fig.update_layout(
         title='Sentiment Score Over Time',
-        labels={'sentiment_score': 'Average Sentiment Score', 'date': 'Date'}
+        xaxis_title='Date',
+        yaxis_title='Average Sentiment Score'
     )
-    
     fig.add_hline(y=0, line_dash="dash", line_color="gray", annotation_text="Neutral")
-    
+
     return fig
 
+def prepare_article_cards(df, limit=10):
+    """
+    Preprocess a slice of articles into plain dicts for card rendering
+
+    Maps display labels once per column instead of per row inside the
+    card loop; key_topics is normalized to a plain list by load_data,
+    whichever source it came from.
+    """
+    cards = df.head(limit)
+    cards = cards.assign(
+        sentiment_label=cards['sentiment'].map(SENTIMENT_LABELS).fillna('Unknown'),
+        impact_label=cards['market_impact'].map(MARKET_IMPACT_LABELS).fillna('Unknown')
+    )
+    return cards.to_dict('records')
+
 def display_article_card(article):
-    """Display an individual article card"""
-    sentiment_color = {
-        'very_positive': 'Very Positive',
-        'positive': 'Positive', 
-        'neutral': 'Neutral',
-        'negative': 'Negative',
-        'very_negative': 'Very Negative'
-    }
-    
-    market_impact_display = {
-        'bullish': 'Bullish',
-        'bearish': 'Bearish',
-        'neutral': 'Neutral',
-        'mixed': 'Mixed'
-    }
-    
+    """Display an individual article card (a dict from prepare_article_cards)"""
     with st.container():
         col1, col2 = st.columns([3, 1])
-        
+
         with col1:
             st.subheader(article['title'])
             st.write(article['summary'])
-            
-            # Topics
-            if isinstance(article['key_topics'], list):
-                topics = article['key_topics']
-            else:
-                topics = eval(article['key_topics']) if isinstance(article['key_topics'], str) else []
-            
+
+            topics = article['key_topics']
             if topics:
                 topic_tags = " ".join([f"`{topic}`" for topic in topics[:5]])
                 st.markdown(f"**Topics:** {topic_tags}")
-        
+
         with col2:
-            st.markdown(f"**Sentiment:** {sentiment_color.get(article['sentiment'], 'Unknown')}")
+            st.markdown(f"**Sentiment:** {article['sentiment_label']}")
             st.markdown(f"**Score:** {article['sentiment_score']:.2f}")
-            st.markdown(f"**Market Impact:** {market_impact_display.get(article['market_impact'], 'Unknown')}")
-            
+            st.markdown(f"**Market Impact:** {article['impact_label']}")
+
             if article['source_url'] != 'unknown':
                 st.markdown(f"[Read Original]({article['source_url']})")
-        
+
         st.markdown("---")
 
+@st.fragment
+def render_metrics(filtered_df, stats):
+    """Metrics row, scoped to a fragment so it reruns independently"""
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Total Articles", len(filtered_df))
+
+    with col2:
+        st.metric("Avg Sentiment", f"{stats['avg_sentiment']:.2f}" if stats else "N/A")
+
+    with col3:
+        st.metric("Positive Articles", stats['positive'] if stats else 0)
+
+    with col4:
+        st.metric("Bullish Articles", stats['bullish'] if stats else 0)
+
+@st.fragment
+def render_articles(filtered_df):
+    """
+    Recent Articles section as a fragment
+
+    The view-type radio lives inside the fragment, so toggling between
+    cards and table reruns only this block - the four Plotly figures
+    above it are not rebuilt.
+    """
+    st.header("Recent Articles")
+
+    # Toggle between table and card view
+    view_type = st.radio("View Type", ["Cards", "Table"], horizontal=True)
+
+    if view_type == "Cards":
+        # Card view - preprocess the slice once, then render plain dicts
+        for article in prepare_article_cards(filtered_df):
+            display_article_card(article)
+    else:
+        # Table view - the grid is virtualized, so the whole frame can be
+        # shown and sorted in the browser without extra Python reruns
+        display_columns = ['title', 'sentiment', 'sentiment_score', 'market_impact', 'source_url', 'extracted_at']
+        st.dataframe(
+            filtered_df[display_columns],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'sentiment_score': st.column_config.ProgressColumn(
+                    "Score", min_value=-1.0, max_value=1.0, format="%.2f"
+                ),
+                'source_url': st.column_config.LinkColumn("Source"),
+                'extracted_at': st.column_config.DatetimeColumn(
+                    "Extracted", format="YYYY-MM-DD HH:mm"
+                )
+            }
+        )
+
 def main():
     st.title("WSJ Sentiment Analysis Dashboard")
     st.markdown("Real-time sentiment analysis of Wall Street Journal articles using AI")
@@ -217,7 +413,8 @@ def main():
     # Data source indicator
     source_indicators = {
         "supabase": "Live Database",
-        "json": "Local JSON File", 
+        "json": "Local JSON File",
+        "parquet": "Parquet Backup",
         "csv": "CSV Backup",
         "none": "No Data"
     }
@@ -254,85 +451,65 @@ def main():
             default=df['market_impact'].unique()
         )
         
-        # Apply filters
-        filtered_df = df[
-            (df['extracted_at'].dt.date >= date_range[0]) &
-            (df['extracted_at'].dt.date <= date_range[1]) &
-            (df['sentiment'].isin(sentiments)) &
-            (df['market_impact'].isin(impacts))
-        ]
+        # Apply filters - pushed down to the database when Supabase is
+        # the source, otherwise applied to the local frame
+        if data_source == "supabase" and len(date_range) == 2:
+            filtered_df = load_filtered_data(
+                date_range[0], date_range[1], tuple(sentiments), tuple(impacts)
+            )
+        else:
+            filtered_df = df[
+                (df['extracted_at'].dt.date >= date_range[0]) &
+                (df['extracted_at'].dt.date <= date_range[1]) &
+                (df['sentiment'].isin(sentiments)) &
+                (df['market_impact'].isin(impacts))
+            ]
     else:
         filtered_df = df
     
+    # Aggregate the filtered frame once; every metric and chart below
+    # reads from this instead of re-scanning the columns
+    if not filtered_df.empty:
+        stats = {
+            'total': len(filtered_df),
+            'avg_sentiment': filtered_df['sentiment_score'].mean(),
+            'positive': int((filtered_df['sentiment_score'] > 0).sum()),
+            'bullish': int((filtered_df['market_impact'] == 'bullish').sum()),
+            'sentiment_counts': filtered_df['sentiment'].value_counts(),
+            'impact_counts': filtered_df['market_impact'].value_counts()
+        }
+    else:
+        stats = None
+
     # Main dashboard
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Total Articles", len(filtered_df))
-    
-    with col2:
-        if not filtered_df.empty:
-            avg_sentiment = filtered_df['sentiment_score'].mean()
-            st.metric("Avg Sentiment", f"{avg_sentiment:.2f}")
-        else:
-            st.metric("Avg Sentiment", "N/A")
-    
-    with col3:
-        if not filtered_df.empty:
-            positive_articles = len(filtered_df[filtered_df['sentiment_score'] > 0])
-            st.metric("Positive Articles", positive_articles)
-        else:
-            st.metric("Positive Articles", 0)
-    
-    with col4:
-        if not filtered_df.empty:
-            bullish_articles = len(filtered_df[filtered_df['market_impact'] == 'bullish'])
-            st.metric("Bullish Articles", bullish_articles)
-        else:
-            st.metric("Bullish Articles", 0)
-    
+    render_metrics(filtered_df, stats)
+
     if not filtered_df.empty:
         # Visualizations
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            st.plotly_chart(create_sentiment_distribution(filtered_df), use_container_width=True)
-        
+            st.plotly_chart(create_sentiment_distribution(stats['sentiment_counts']), use_container_width=True, key="sentiment_dist")
+
         with col2:
-            st.plotly_chart(create_market_impact_chart(filtered_df), use_container_width=True)
-        
+            st.plotly_chart(create_market_impact_chart(stats['impact_counts']), use_container_width=True, key="market_impact")
+
         # Sentiment gauge
         col1, col2 = st.columns([1, 1])
-        
+
         with col1:
-            avg_sentiment_score = filtered_df['sentiment_score'].mean()
-            st.plotly_chart(create_sentiment_gauge(avg_sentiment_score), use_container_width=True)
+            st.plotly_chart(create_sentiment_gauge(stats['avg_sentiment']), use_container_width=True, key="sentiment_gauge")
         
         with col2:
-            timeline_chart = create_sentiment_timeline(filtered_df)
+            filter_state = (tuple(date_range), tuple(sentiments), tuple(impacts))
+            timeline_chart = create_sentiment_timeline(filtered_df, filter_state)
             if timeline_chart:
-                st.plotly_chart(timeline_chart, use_container_width=True)
+                st.plotly_chart(timeline_chart, use_container_width=True, key="sentiment_timeline")
             else:
                 st.info("Not enough data points for timeline chart")
         
         # Articles table/cards
-        st.header("Recent Articles")
-        
-        # Toggle between table and card view
-        view_type = st.radio("View Type", ["Cards", "Table"], horizontal=True)
-        
-        if view_type == "Cards":
-            # Card view
-            for _, article in filtered_df.head(10).iterrows():
-                display_article_card(article)
-        else:
-            # Table view
-            display_columns = ['title', 'sentiment', 'sentiment_score', 'market_impact', 'extracted_at']
-            st.dataframe(
-                filtered_df[display_columns].head(20),
-                use_container_width=True,
-                hide_index=True
-            )
+        render_articles(filtered_df)
     
     # Refresh button
     if st.sidebar.button("Refresh Data"):
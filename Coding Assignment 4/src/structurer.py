@@ -5,14 +5,57 @@ Uses OpenAI to analyze WSJ articles and extract structured data with sentiment
 
 import json
 import hashlib
+import os
+import re
 from datetime import datetime
 from llm_client import LLMClient
 from schema import ARTICLE_SCHEMA, EXAMPLE_OUTPUT
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Markdown code fences the LLM sometimes wraps around its JSON output
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+# One pass over the blob pulls every section's (title, url) pair
+_SECTION_RE = re.compile(r'=== ARTICLE.*?TITLE:\s*(.+?)\r?\n.*?URL:\s*(\S+)', re.DOTALL)
+
 class WSJStructurer:
-    def __init__(self):
+    def __init__(self, cache_dir="data/llm_cache"):
         self.llm_client = LLMClient()
-        
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, raw_text_blob):
+        """Build the on-disk cache path for a batch of article text"""
+        content_hash = hashlib.blake2b(raw_text_blob.encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{content_hash}.json")
+
+    def _load_cached_result(self, raw_text_blob):
+        """Return the cached LLM result for this content, or None on a miss"""
+        cache_path = self._cache_path(raw_text_blob)
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    data = f.read()
+                return orjson.loads(data) if orjson else json.loads(data)
+            except (ValueError, OSError):
+                return None
+        return None
+
+    def _save_cached_result(self, raw_text_blob, structured_data):
+        """Persist a successful LLM result keyed by content hash"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(raw_text_blob), 'wb') as f:
+                if orjson:
+                    f.write(orjson.dumps(structured_data))
+                else:
+                    f.write(json.dumps(structured_data, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            print(f"Could not write LLM cache: {e}")
+
     def create_analysis_prompt(self, raw_text_blob):
         """
         Create a prompt for the LLM to analyze the text blob
@@ -76,23 +119,102 @@ Remember: Return ONLY the JSON structure, no additional text."""
     
     def generate_article_id(self, title, url):
         """Generate a unique ID for an article based on title and URL"""
+        # blake2b is faster than md5 on short inputs and emits exactly
+        # the 16 hex chars we need instead of truncating a 32-char digest
         content = f"{title}_{url}".encode('utf-8')
-        return hashlib.md5(content).hexdigest()[:16]
+        return hashlib.blake2b(content, digest_size=8).hexdigest()
     
-    def process_blob(self, raw_text_blob):
+    def process_blob(self, raw_text_blob, batch_size=5):
         """
         Process the raw text blob and return structured JSON
-        
+
+        Articles are grouped into batches of batch_size per LLM call so
+        large blobs neither overflow the context window nor burn one
+        request per article.
+
         Args:
-            raw_text_blob: String containing raw article text
-            
+            raw_text_blob: String (or iterable of string chunks) containing raw article text
+            batch_size: Number of articles to structure per LLM call
+
+        Returns:
+            Dict containing structured article data or None if failed
+        """
+        # The collector may hand over a list of chunks; the prompt needs one string
+        if not isinstance(raw_text_blob, str):
+            raw_text_blob = ''.join(raw_text_blob)
+
+        # Split into article sections so we can batch them per LLM call
+        sections = raw_text_blob.split('=== ARTICLE')
+        article_sections = ['=== ARTICLE' + section for section in sections[1:]]
+
+        if len(article_sections) <= batch_size:
+            return self._structure_batch(raw_text_blob)
+
+        all_articles = []
+        for i in range(0, len(article_sections), batch_size):
+            batch_blob = '\\n'.join(article_sections[i:i + batch_size])
+            print(f"Structuring articles {i+1}-{min(i+batch_size, len(article_sections))} of {len(article_sections)}...")
+
+            batch_result = self._structure_batch(batch_blob)
+            if batch_result and batch_result.get('articles'):
+                all_articles.extend(batch_result['articles'])
+
+        return {"articles": all_articles}
+
+    def structure_stream(self, chunks, batch_size=5):
+        """
+        Structure articles from an iterable of blob chunks as they arrive
+
+        Pipelined counterpart to process_blob: consumes chunks from a
+        generator or queue so LLM calls for full batches start while the
+        collector is still scraping later articles.
+
+        Args:
+            chunks: Iterable of formatted article chunk strings
+            batch_size: Number of articles to structure per LLM call
+
+        Returns:
+            Dict containing structured article data
+        """
+        all_articles = []
+        batch = []
+
+        def flush():
+            batch_result = self._structure_batch('\\n'.join(batch))
+            if batch_result and batch_result.get('articles'):
+                all_articles.extend(batch_result['articles'])
+            batch.clear()
+
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+        return {"articles": all_articles}
+
+    def _structure_batch(self, raw_text_blob):
+        """
+        Run one LLM call over a batch of articles and parse the result
+
+        Args:
+            raw_text_blob: String containing the batch's raw article text
+
         Returns:
             Dict containing structured article data or None if failed
         """
+        # Re-runs over identical content hit the disk cache, not the LLM
+        cached_result = self._load_cached_result(raw_text_blob)
+        if cached_result is not None:
+            print(f"Using cached LLM result for {len(cached_result.get('articles', []))} articles")
+            return cached_result
+
         try:
             # Create the prompt
             messages = self.create_analysis_prompt(raw_text_blob)
-            
+
             # Get LLM response
             print("Sending text to LLM for analysis...")
             response = self.llm_client.generate_completion(
@@ -109,15 +231,12 @@ Remember: Return ONLY the JSON structure, no additional text."""
             
             # Try to parse the JSON response
             try:
-                # Clean the response - remove any markdown formatting
-                cleaned_response = response.strip()
-                if cleaned_response.startswith('```json'):
-                    cleaned_response = cleaned_response[7:]
-                if cleaned_response.endswith('```'):
-                    cleaned_response = cleaned_response[:-3]
-                cleaned_response = cleaned_response.strip()
-                
-                structured_data = json.loads(cleaned_response)
+                # Clean the response - strip any markdown fences in one
+                # pre-compiled regex pass instead of chained slice/strip calls
+                cleaned_response = _FENCE_RE.sub('', response)
+
+                # orjson parses the LLM response in C; fall back to stdlib json
+                structured_data = orjson.loads(cleaned_response) if orjson else json.loads(cleaned_response)
                 
                 # Validate and enhance the data
                 if 'articles' in structured_data:
@@ -134,6 +253,7 @@ Remember: Return ONLY the JSON structure, no additional text."""
                             article['extracted_at'] = datetime.now().isoformat()
                 
                 print(f"Successfully structured {len(structured_data.get('articles', []))} articles")
+                self._save_cached_result(raw_text_blob, structured_data)
                 return structured_data
                 
             except json.JSONDecodeError as e:
@@ -158,43 +278,26 @@ Remember: Return ONLY the JSON structure, no additional text."""
             Basic structured data
         """
         print("Creating fallback structure...")
-        
-        # Try to extract basic info from the blob
+
+        # One regex pass over the blob extracts every (title, url) pair
+        # instead of splitting sections and scanning lines per article
         articles = []
-        sections = raw_text_blob.split('=== ARTICLE')
-        
-        for i, section in enumerate(sections[1:], 1):  # Skip first empty section
-            try:
-                lines = section.strip().split('\\n')
-                title = "Unknown Article"
-                url = "unknown"
-                
-                # Extract title and URL
-                for line in lines[:10]:  # Check first 10 lines
-                    if line.startswith('TITLE:'):
-                        title = line.replace('TITLE:', '').strip()
-                    elif line.startswith('URL:'):
-                        url = line.replace('URL:', '').strip()
-                
-                # Create basic article structure
-                article = {
-                    "id": self.generate_article_id(title, url),
-                    "title": title,
-                    "summary": f"Article summary not available - LLM processing failed for: {title}",
-                    "sentiment": "neutral",
-                    "sentiment_score": 0.0,
-                    "key_topics": ["news", "finance"],
-                    "market_impact": "neutral",
-                    "source_url": url,
-                    "extracted_at": datetime.now().isoformat()
-                }
-                
-                articles.append(article)
-                
-            except Exception as e:
-                print(f"Error creating fallback for section {i}: {e}")
-                continue
-        
+        for title, url in _SECTION_RE.findall(raw_text_blob):
+            title = title.strip() or "Unknown Article"
+            article = {
+                "id": self.generate_article_id(title, url),
+                "title": title,
+                "summary": f"Article summary not available - LLM processing failed for: {title}",
+                "sentiment": "neutral",
+                "sentiment_score": 0.0,
+                "key_topics": ["news", "finance"],
+                "market_impact": "neutral",
+                "source_url": url,
+                "extracted_at": datetime.now().isoformat()
+            }
+
+            articles.append(article)
+
         return {"articles": articles}
     
     def save_structured_data(self, structured_data, output_file="data/structured_articles.json"):
@@ -205,13 +308,15 @@ Remember: Return ONLY the JSON structure, no additional text."""
             structured_data: Dict containing article data
             output_file: Path to save the JSON file
         """
-        import os
-        
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(structured_data, f, indent=2, ensure_ascii=False)
-        
+
+        # orjson serializes straight to bytes, so write in binary mode
+        with open(output_file, 'wb') as f:
+            if orjson:
+                f.write(orjson.dumps(structured_data, option=orjson.OPT_INDENT_2))
+            else:
+                f.write(json.dumps(structured_data, indent=2, ensure_ascii=False).encode('utf-8'))
+
         print(f"Structured data saved to {output_file}")
         return output_file
 